@@ -13,39 +13,158 @@ The crawler:
 4. Organizes files according to the document tree structure
 """
 
+import asyncio
+import codecs
+import hashlib
 import random
 import os
 import re
+import sys
 import json
 import time
 import logging
+from collections import deque
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Pattern, Set, Tuple
 from urllib.parse import urljoin, quote
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Pre-compiled patterns used on hot paths
+_ILLEGAL_PATH_RE = re.compile(r'[<>:"/\\|?*]')
+_SETTINGS_RE = re.compile(r'window\.settings\s*=\s*({.*?})\s*;?\s*</script>', re.DOTALL)
+# Frontmatter fields, matched only inside the block returned by _read_frontmatter
+_TITLE_RE = re.compile(r'^title:[ \t]*"([^\n]*)"[ \t]*$', re.MULTILINE)
+_UPDATE_TIME_RE = re.compile(r'^update_time:[ \t]*(\d+)', re.MULTILINE)
+_ETAG_RE = re.compile(r'^etag:[ \t]*("(?:[^"\\\n]|\\.)*")[ \t]*$', re.MULTILINE)
+_CONTENT_HASH_RE = re.compile(r'^content_hash:[ \t]*"([0-9a-f]*)"', re.MULTILINE)
+_UPDATE_TIME_LINE_RE = re.compile(r'^update_time:.*\n', re.MULTILINE)
+_ETAG_LINE_RE = re.compile(r'^etag:.*\n', re.MULTILINE)
+
+# Responses that signal the server wants us to back off
+_THROTTLE_STATUSES = (429, 502, 503)
+_MAX_FETCH_ATTEMPTS = 5
+_MAX_RETRY_DELAY = 60.0
+
+
+def _retry_delay(retry_after: Optional[str], attempt: int) -> float:
+    """Seconds to wait before retrying, honouring Retry-After when numeric."""
+    try:
+        return min(_MAX_RETRY_DELAY, max(0.0, float(retry_after)))
+    except (TypeError, ValueError):
+        return min(_MAX_RETRY_DELAY, 0.5 * 2 ** attempt)
+
+
+class AdmissionController:
+    """AIMD admission gate for concurrent requests.
+
+    The concurrency limit grows additively while mean latency stays under
+    ``target_latency`` and is halved on slow responses, throttling or
+    errors. A sliding one-minute window additionally caps requests/minute.
+    """
+
+    def __init__(self, initial: float = 4, min_limit: int = 1, max_limit: int = 32,
+                 target_latency: float = 1.5, rpm_limit: int = 600):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.rpm_limit = rpm_limit
+        self._inflight = 0
+        self._latencies = deque(maxlen=16)
+        self._timestamps = deque()
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        """Wait until both the concurrency limit and the rate window admit a request."""
+        async with self._cond:
+            while True:
+                await self._cond.wait_for(lambda: self._inflight < int(self.limit))
+
+                # Drop timestamps that have left the sliding window
+                now = time.monotonic()
+                while self._timestamps and now - self._timestamps[0] >= 60:
+                    self._timestamps.popleft()
+                if len(self._timestamps) < self.rpm_limit:
+                    break
+
+                # Window is full: wait for the oldest request to expire
+                try:
+                    await asyncio.wait_for(self._cond.wait(), self._timestamps[0] + 60 - now)
+                except asyncio.TimeoutError:
+                    pass
+
+            self._inflight += 1
+            self._timestamps.append(now)
+
+    async def release(self, latency: float, ok: bool = True):
+        """Free a slot and adjust the limit from the request's outcome."""
+        async with self._cond:
+            self._inflight -= 1
+            if ok:
+                self._latencies.append(latency)
+            if ok and sum(self._latencies) / len(self._latencies) <= self.target_latency:
+                self.limit = min(self.max_limit, self.limit + 0.5)
+            else:
+                self.limit = max(self.min_limit, self.limit * 0.5)
+                # Judge the new limit on fresh samples only
+                self._latencies.clear()
+            self._cond.notify_all()
 
 
 class WeWorkDocCrawler:
     def __init__(self, base_url: str = "https://developer.work.weixin.qq.com",
-                 output_dir: str = "docs"):
+                 output_dir: str = "docs", max_concurrency: int = 32):
         self.base_url = base_url
         self.output_dir = Path(output_dir)
+        self.max_concurrency = max_concurrency
+        self._existing_docs: Dict[Path, Dict] = {}
+        self._created_dirs: Set[Path] = set()
+        self._generated_at = time.strftime('%Y-%m-%d %H:%M:%S')
+        self._rng = random.Random()
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
 
+        # Pool keep-alive connections and retry transient failures
+        retry = Retry(total=5, backoff_factor=0.5,
+                      status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=["GET", "POST"])
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
         # Setup logging
         logging.basicConfig(level=logging.INFO,
                             format='%(asctime)s - %(levelname)s - %(message)s')
         self.logger = logging.getLogger(__name__)
 
-    def fetch_page(self, url: str) -> Optional[str]:
-        """Fetch a web page and return its content."""
+    def fetch_page(self, url: str, until: Optional[Pattern[str]] = None) -> Optional[str]:
+        """Fetch a web page and return its content.
+
+        If ``until`` is given, the body is streamed and reading stops as soon
+        as the pattern matches the content received so far.
+        """
         try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            return response.text
+            with self.session.get(url, timeout=30, stream=True) as response:
+                # Bail out on error statuses before touching the body
+                response.raise_for_status()
+                decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+                content = ''
+                for chunk in response.iter_content(65536):
+                    content += decoder.decode(chunk)
+                    if until is not None and until.search(content):
+                        return content
+                return content + decoder.decode(b'', final=True)
         except Exception as e:
             self.logger.error(f"Error fetching {url}: {e}")
             return None
@@ -54,30 +173,36 @@ class WeWorkDocCrawler:
         """Extract categories from the main document page."""
         self.logger.info(f"Extracting categories from {url}")
 
-        content = self.fetch_page(url)
+        # Stop downloading once window.settings has been received
+        content = self.fetch_page(url, until=_SETTINGS_RE)
         if not content:
             return None
 
         # Find window.settings object
-        pattern = r'window\.settings\s*=\s*({.*?});'
-        match = re.search(pattern, content, re.DOTALL)
+        match = _SETTINGS_RE.search(content)
 
         if not match:
             self.logger.error("Could not find window.settings in the page")
             return None
 
         try:
-            settings_str = match.group(1)
-            # Parse JSON (might need to handle some JS-specific syntax)
-            settings_str = settings_str[0:settings_str.index('</script>')]
-            settings = json.loads(settings_str)
+            # The match ends at the closing brace right before </script>
+            settings = _json_loads(match.group(1))
             return settings.get('categories', [])
         except json.JSONDecodeError as e:
             self.logger.error(f"Error parsing window.settings JSON: {e}")
             return None
 
-    def fetch_document_content(self, doc_id: str) -> Optional[Dict]:
-        """Fetch document content using the provided API."""
+    async def fetch_document_content(self, session: aiohttp.ClientSession,
+                                     admission: AdmissionController, doc_id: str,
+                                     etag: Optional[str] = None) -> Optional[Tuple[Optional[Dict], Optional[str]]]:
+        """Fetch document content using the provided API.
+
+        Returns a (data, etag) pair, where data holds only the title and
+        content_md of the response, or None if the server reports the
+        document as not modified since ``etag``. Throttled requests and
+        timeouts are retried after backing off.
+        """
         api_url = "https://developer.work.weixin.qq.com/docFetch/fetchCnt"
 
         headers = {
@@ -87,20 +212,54 @@ class WeWorkDocCrawler:
             "priority": "u=1, i",
             "referer": "https://developer.work.weixin.qq.com/document/path/" + doc_id,
         }
+        if etag:
+            headers["If-None-Match"] = etag
 
         data = f"doc_id={doc_id}"
         params = {
             "lang": "zh_CN",
             "ajax": "1",
             "f": "json",
-            "random": str(random.randint(10 ** 5 + 1, 10 ** 6)),  # This might need to be randomized
+            "random": str(self._rng.randint(10 ** 5 + 1, 10 ** 6)),  # Cache buster, keeps the 6-digit range
         }
 
         try:
-            response = self.session.post(api_url, headers=headers, data=data,
-                                         params=params, timeout=30)
-            response.raise_for_status()
-            return response.json()
+            for attempt in range(1, _MAX_FETCH_ATTEMPTS + 1):
+                await admission.acquire()
+                start = time.monotonic()
+                ok = False
+                retry_after = None
+                try:
+                    async with session.post(api_url, headers=headers, data=data, params=params,
+                                            timeout=aiohttp.ClientTimeout(total=30)) as response:
+                        if response.status in _THROTTLE_STATUSES:
+                            cause = f"HTTP {response.status}"
+                            retry_after = response.headers.get("Retry-After")
+                        else:
+                            if response.status == 304:
+                                ok = True
+                                return None
+                            response.raise_for_status()
+                            # Only successful responses count as healthy latency samples
+                            ok = True
+                            # Keep only the fields we use so the rest of the parsed
+                            # response can be freed straight away
+                            doc = _json_loads(await response.read()).get('data')
+                            if doc:
+                                doc = {'title': doc.get('title'), 'content_md': doc.get('content_md') or ''}
+                            return doc, response.headers.get("ETag")
+                except asyncio.TimeoutError:
+                    cause = "timeout"
+                finally:
+                    await admission.release(time.monotonic() - start, ok)
+
+                if attempt == _MAX_FETCH_ATTEMPTS:
+                    raise Exception(f"Gave up after {_MAX_FETCH_ATTEMPTS} attempts ({cause})")
+
+                delay = _retry_delay(retry_after, attempt)
+                self.logger.warning(f"Fetching document {doc_id} failed ({cause}), retrying in {delay:.1f}s "
+                                    f"(attempt {attempt}/{_MAX_FETCH_ATTEMPTS})")
+                await asyncio.sleep(delay)
         except Exception as e:
             self.logger.error(f"Error fetching document {doc_id}: {e}")
             raise e
@@ -108,10 +267,10 @@ class WeWorkDocCrawler:
 
     def build_category_tree(self, categories: List[Dict]) -> Dict:
         """Build a hierarchical tree from flat categories list."""
-        # Create a mapping of id to category
-        cat_map = {cat['id']: cat for cat in categories}
+        # Create a mapping of category_id to tree node
+        nodes = {cat['category_id']: {'category': cat, 'children': {}} for cat in categories}
 
-        # Build the tree structure
+        # Attach every node to its parent in a single pass
         tree = {}
 
         for cat in categories:
@@ -119,56 +278,33 @@ class WeWorkDocCrawler:
 
             if parent_id == 0:
                 # Root category
-                tree[cat['category_id']] = {
-                    'category': cat,
-                    'children': {}
-                }
-            else:
-                # Find parent and add as child
-                self._add_to_tree(tree, parent_id, cat)
+                tree[cat['category_id']] = nodes[cat['category_id']]
+            elif parent_id in nodes:
+                nodes[parent_id]['children'][cat['category_id']] = nodes[cat['category_id']]
 
         return tree
 
-    def _add_to_tree(self, tree: Dict, parent_id: int, category: Dict):
-        """Recursively add category to tree."""
-        for node_id, node in tree.items():
-            if node_id == parent_id:
-                node['children'][category['category_id']] = {
-                    'category': category,
-                    'children': {}
-                }
-                return
-            else:
-                self._add_to_tree(node['children'], parent_id, category)
-
-    def generate_file_path(self, category_path: List[str], title: str) -> Path:
-        """Generate file path based on category hierarchy."""
-        # Clean up path components
-        clean_path = []
-        for component in category_path:
-            # Remove special characters and normalize
-            clean_component = re.sub(r'[<>:"/\\|?*]', '', component)
-            clean_component = clean_component.strip()
-            clean_path.append(clean_component)
-
-        # Clean up filename
-        clean_title = re.sub(r'[<>:"/\\|?*]', '', title)
-        clean_title = clean_title.strip()
-
-        # Build full path
-        full_path = self.output_dir / Path(*clean_path) / f"{clean_title}.mdx"
-        return full_path
-
-    def md_to_mdx(self, markdown_content: str, title: str, category_id: int, update_time: int = 0) -> str:
+    def clean_path_component(self, component: str) -> str:
+        """Remove characters that are illegal in file names and normalize."""
+        return _ILLEGAL_PATH_RE.sub('', component).strip()
+
+    def generate_file_path(self, clean_path: Tuple[str, ...], clean_title: str) -> Path:
+        """Generate file path from already-cleaned category hierarchy and title."""
+        return self.output_dir.joinpath(*clean_path, f"{clean_title}.mdx")
+
+    def md_to_mdx(self, markdown_content: str, title: str, category_id: int, update_time: int = 0,
+                  etag: str = "", content_hash: str = "") -> str:
         """Convert markdown content to MDX format by adding frontmatter."""
         if not markdown_content:
             return f"# {title}\n\n*No content available*\n"
 
-        # Add MDX frontmatter to existing markdown
+        # Add MDX frontmatter to existing markdown; etag only when the server sent one
+        etag_line = f"etag: {json.dumps(etag)}\n" if etag else ""
         frontmatter = f"""---
 title: "{title}"
-generated_at: "{time.strftime('%Y-%m-%d %H:%M:%S')}"
+generated_at: "{self._generated_at}"
 update_time: {update_time}
+{etag_line}content_hash: "{content_hash}"
 source: "https://developer.work.weixin.qq.com/document/path/{category_id}"
 ---
 
@@ -176,28 +312,90 @@ source: "https://developer.work.weixin.qq.com/document/path/{category_id}"
 
         return frontmatter + markdown_content
 
-    def extract_update_time_from_mdx(self, file_path: Path) -> Optional[int]:
-        """Extract update_time from existing MDX file's frontmatter."""
+    def _read_frontmatter(self, file_path: Path) -> str:
+        """Read the frontmatter block of an MDX file, or '' if it has none."""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read(4096)
+            if not content.startswith('---'):
+                return ''
+            end = content.find('\n---', 3)
+            # Frontmatter longer than the first block is unusual; read the rest
+            if end == -1:
+                content += f.read()
+                end = content.find('\n---', 3)
+        # Cut at the closing marker so fields are never matched in the body
+        return content[:end + 1] if end != -1 else ''
+
+    def extract_frontmatter_from_mdx(self, file_path: Path) -> Dict:
+        """Extract title, update_time, etag and content_hash from existing MDX file's frontmatter."""
+        fields = {}
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
+            content = self._read_frontmatter(file_path)
+
+            # Match frontmatter and extract title
+            match = _TITLE_RE.search(content)
+            if match:
+                fields['title'] = match.group(1)
+
             # Match frontmatter and extract update_time
-            pattern = r'^---\s*\n.*?update_time:\s*(\d+).*?\n---'
-            match = re.search(pattern, content, re.DOTALL | re.MULTILINE)
-            
+            match = _UPDATE_TIME_RE.search(content)
             if match:
-                return int(match.group(1))
-            return None
+                fields['update_time'] = int(match.group(1))
+
+            # Match frontmatter and extract the JSON-quoted etag
+            match = _ETAG_RE.search(content)
+            if match:
+                fields['etag'] = json.loads(match.group(1)) or None
+
+            # Match frontmatter and extract the content hash
+            match = _CONTENT_HASH_RE.search(content)
+            if match:
+                fields['content_hash'] = match.group(1) or None
         except Exception as e:
-            self.logger.error(f"Error reading update_time from {file_path}: {e}")
-            return None
+            self.logger.error(f"Error reading frontmatter from {file_path}: {e}")
+        return fields
+
+    def scan_existing_documents(self) -> Dict[Path, Dict]:
+        """Collect the frontmatter of every MDX file under output_dir in one walk."""
+        existing = {}
+        for dirpath, _, filenames in os.walk(self.output_dir):
+            for name in filenames:
+                if name.endswith('.mdx'):
+                    file_path = Path(dirpath) / name
+                    existing[file_path] = self.extract_frontmatter_from_mdx(file_path)
+        return existing
+
+    def update_frontmatter(self, file_path: Path, update_time: int, etag: Optional[str] = None):
+        """Record a new update_time and etag in an MDX file's frontmatter, keeping its body."""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+
+            end = content.find('\n---', 3)
+            if not content.startswith('---') or end == -1:
+                raise ValueError("no frontmatter found")
+
+            # Replace the update_time line (and etag line, if any) in place
+            fields = f"update_time: {update_time}\n"
+            if etag:
+                fields += f"etag: {json.dumps(etag)}\n"
+            head = _ETAG_LINE_RE.sub('', content[:end + 1])
+            head = _UPDATE_TIME_LINE_RE.sub(lambda m: fields, head, count=1)
+
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(head + content[end + 1:])
+
+            self.logger.info(f"Updated frontmatter: {file_path}")
+        except Exception as e:
+            self.logger.error(f"Error updating frontmatter of {file_path}: {e}")
 
     def save_document(self, file_path: Path, content: str):
         """Save document content to file."""
         try:
-            # Create directory if it doesn't exist
-            file_path.parent.mkdir(parents=True, exist_ok=True)
+            # Create directory if it hasn't been seen during this run
+            if file_path.parent not in self._created_dirs:
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                self._created_dirs.add(file_path.parent)
 
             # Write content
             with open(file_path, 'w', encoding='utf-8') as f:
@@ -207,61 +405,150 @@ source: "https://developer.work.weixin.qq.com/document/path/{category_id}"
         except Exception as e:
             self.logger.error(f"Error saving {file_path}: {e}")
 
-    def crawl_tree(self, tree: Dict, path: List[str] = None):
-        """Recursively crawl the document tree."""
-        if path is None:
-            path = []
+    def _collect_leaves(self, tree: Dict, path: Tuple[str, ...] = (),
+                        seen: Optional[Set[Path]] = None) -> List[Tuple[Path, int, int, Dict]]:
+        """Flatten the document tree into (file_path, doc_id, update_time, category) tuples.
+
+        ``path`` holds the already-cleaned titles of the ancestors, so each
+        title is sanitized exactly once. Documents that resolve to a file
+        path already taken are skipped, so no two workers write one file.
+        """
+        if seen is None:
+            seen = set()
 
+        leaves = []
         for node_id, node in tree.items():
             category = node['category']
-            current_path = path + [category['title']]
+            if '_clean_title' not in node:
+                node['_clean_title'] = self.clean_path_component(category['title'])
+            current_path = path + (node['_clean_title'],)
 
             # Check if this is a leaf node (has doc_id)
             if category.get('doc_id', 0) > 0:
-                # Generate file path
-                file_path = self.generate_file_path(current_path[:-1], category['title'])
-                doc_id = category['doc_id']
-                update_time = category.get('time', 0)  # 文档的更新时间
-                
-                # Check if file needs to be updated
-                needs_update = True
-                if os.path.exists(file_path):
-                    existing_update_time = self.extract_update_time_from_mdx(file_path)
-                    if existing_update_time is not None and existing_update_time >= update_time:
-                        self.logger.info(f"Skipping {category['title']} (already up-to-date)")
-                        needs_update = False
-                    else:
-                        self.logger.info(f"Updating {category['title']} (local: {existing_update_time}, remote: {update_time})")
-                
-                if needs_update:
-                    self.logger.info(f"Processing document: {category['title']} (ID: {doc_id})")
-
-                    # Fetch document content
-                    doc_data = self.fetch_document_content(str(doc_id))
-
-                    if doc_data and doc_data.get('data'):
-                        data = doc_data['data']
-                        title = data.get('title', category['title'])
-
-                        # Use markdown content directly from API
-                        content_md = data.get('content_md', '')
-
-                        # Convert to MDX (just add frontmatter to existing markdown)
-                        mdx_content = self.md_to_mdx(content_md, title, category['category_id'], update_time)
-                        # Save document
-                        self.save_document(file_path, mdx_content)
-                    else:
-                        raise Exception("No data found in the response")
-                    # Add delay to be respectful
-                    time.sleep(1)
-
-            # Recursively process children
+                file_path = self.generate_file_path(path, node['_clean_title'])
+                if file_path in seen:
+                    self.logger.warning(f"Skipping {category['title']} (ID: {category['doc_id']}): "
+                                        f"{file_path} is already used by another document")
+                else:
+                    seen.add(file_path)
+                    update_time = category.get('time', 0)  # 文档的更新时间
+                    leaves.append((file_path, category['doc_id'], update_time, category))
+
+            # Recursively collect children
             if node['children']:
-                self.crawl_tree(node['children'], current_path)
+                leaves.extend(self._collect_leaves(node['children'], current_path, seen))
+
+        return leaves
+
+    async def _crawl_leaf(self, session: aiohttp.ClientSession, admission: AdmissionController,
+                          leaf: Tuple[Path, int, int, Dict]):
+        """Fetch and save a single document if the local copy is outdated."""
+        file_path, doc_id, update_time, category = leaf
+
+        # Check if file needs to be updated against the pre-scanned frontmatter
+        existing = self._existing_docs.get(file_path)
+        existing_etag = None
+        if existing is not None:
+            existing_update_time = existing.get('update_time')
+            if existing_update_time is not None and existing_update_time >= update_time:
+                self.logger.info(f"Skipping {category['title']} (already up-to-date)")
+                return
+            self.logger.info(f"Updating {category['title']} (local: {existing_update_time}, remote: {update_time})")
+            existing_etag = existing.get('etag')
+
+        self.logger.info(f"Processing document: {category['title']} (ID: {doc_id})")
+
+        # Fetch document content, conditional on the stored etag
+        result = await self.fetch_document_content(session, admission, str(doc_id), existing_etag)
+
+        if result is None:
+            # Not modified: record the new update_time so the next run skips it
+            self.logger.info(f"Skipping {category['title']} (not modified)")
+            await asyncio.to_thread(self.update_frontmatter, file_path, update_time, existing_etag)
+            return
+
+        data, etag = result
+        if data:
+            title = data['title'] or category['title']
+
+            # Use markdown content directly from API
+            content_md = data['content_md']
+
+            if etag and etag == existing_etag:
+                self.logger.info(f"Skipping {category['title']} (not modified)")
+                await asyncio.to_thread(self.update_frontmatter, file_path, update_time, etag)
+                return
+
+            # Same body and title: rewrite only update_time/etag so generated_at
+            # stays put and the git diff is limited to the fields that moved
+            content_hash = hashlib.sha256(content_md.encode('utf-8')).hexdigest()
+            if (existing and existing.get('content_hash') == content_hash
+                    and existing.get('title') == title):
+                await asyncio.to_thread(self.update_frontmatter, file_path, update_time, etag)
+                return
+
+            # Convert to MDX (just add frontmatter to existing markdown)
+            mdx_content = self.md_to_mdx(content_md, title, category['category_id'], update_time,
+                                         etag or "", content_hash)
+            # Save document
+            await asyncio.to_thread(self.save_document, file_path, mdx_content)
+        else:
+            raise Exception("No data found in the response")
+
+    async def _worker(self, queue: asyncio.Queue, session: aiohttp.ClientSession,
+                      admission: AdmissionController):
+        """Pull leaf documents off the queue until it is drained."""
+        while True:
+            try:
+                leaf = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                await self._crawl_leaf(session, admission, leaf)
+            except Exception:
+                # Stop handing out documents; other workers finish their current one
+                while not queue.empty():
+                    queue.get_nowait()
+                raise
+
+    async def _crawl_all(self, leaves: List[Tuple[Path, int, int, Dict]]):
+        """Crawl all leaf documents with a pool of workers over a shared HTTP session."""
+        # The admission controller adapts in-flight requests to the server's health
+        admission = AdmissionController(max_limit=self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300)
+        headers = {'User-Agent': self.session.headers['User-Agent']}
+
+        async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+            queue = asyncio.Queue()
+            for leaf in leaves:
+                queue.put_nowait(leaf)
+
+            # Enough workers to fill the admission ceiling. A failing worker drains
+            # the queue so in-flight documents are still saved before the session
+            # closes; the first failure is re-raised afterwards
+            workers = [asyncio.create_task(self._worker(queue, session, admission))
+                       for _ in range(self.max_concurrency)]
+            results = await asyncio.gather(*workers, return_exceptions=True)
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def _install_event_loop_policy(self):
+        """Use uvloop when available, or the selector loop on Windows."""
+        if sys.platform == 'win32':
+            asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+            return
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            pass
 
     def run(self):
         """Main crawler execution."""
         self.logger.info("Starting WeWork documentation crawler...")
+        self._generated_at = time.strftime('%Y-%m-%d %H:%M:%S')
 
         # Create output directory
         self.output_dir.mkdir(exist_ok=True)
@@ -279,8 +566,14 @@ source: "https://developer.work.weixin.qq.com/document/path/{category_id}"
         # Build category tree
         tree = self.build_category_tree(categories)
 
-        # Start crawling
-        self.crawl_tree(tree)
+        # Collect leaf documents and crawl them concurrently
+        leaves = self._collect_leaves(tree)
+        self.logger.info(f"Found {len(leaves)} documents")
+        self._existing_docs = self.scan_existing_documents()
+        self._created_dirs = {file_path.parent for file_path in self._existing_docs}
+        self.logger.info(f"Found {len(self._existing_docs)} existing documents")
+        self._install_event_loop_policy()
+        asyncio.run(self._crawl_all(leaves))
 
         self.logger.info("Crawling completed!")
 